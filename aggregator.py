@@ -0,0 +1,124 @@
+"""
+Burst aggregation for chat-created issues.
+
+Reports for the same customer whose keyword sets overlap enough, arriving within a short
+window, are handed to a single flush call (one issue, one comment, one attachment upload).
+Every submitter awaits the result of its group. Groups live in this process only (one
+aggregator per worker).
+"""
+import asyncio
+from typing import Awaitable, Callable
+
+from summarizer import keywords
+
+GROUP_BY_CHOICES = ("customer+keywords", "customer", "keywords")
+
+
+def group_key(customer_name: str, group_by: str = "customer+keywords") -> str:
+    """Partition reports are matched within: the customer name, or one shared partition for "keywords"."""
+    if group_by == "keywords":
+        return ""
+    return (customer_name or "NA").strip().lower()
+
+
+def report_terms(message: str, group_by: str = "customer+keywords", keyword_count: int = 6) -> frozenset | None:
+    """Keyword set compared against open groups; None when grouping by customer only."""
+    if group_by == "customer":
+        return None
+    return frozenset(keywords(message, keyword_count))
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    """Overlap of two keyword sets (1.0 for two empty sets)."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class BurstAggregator:
+    """
+    Holds reports for window seconds (or until max_group arrive), then flushes them together.
+    flush returns one result per report; an exception in that list is raised to that report's submitter.
+    A report joins the open group in its partition whose members share the most keywords with it
+    (Jaccard >= similarity), so paraphrases with reordered or extra words still land together.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[list[dict]], Awaitable[list[dict]]],
+        window: float,
+        max_group: int,
+        similarity: float = 0.5,
+    ):
+        self._flush = flush
+        self.window = window
+        self.max_group = max(1, max_group)
+        self.similarity = similarity
+        self._groups: dict[str, list[dict]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def _match(self, key: str, terms: frozenset | None) -> dict | None:
+        best, best_score = None, -1.0
+        for group in self._groups.get(key, ()):
+            if terms is None:
+                return group
+            score = max(jaccard(terms, t) for t in group["terms"])
+            if score >= self.similarity and score > best_score:
+                best, best_score = group, score
+        return best
+
+    async def submit(self, key: str, report: dict, terms: frozenset | None = None) -> dict:
+        """Add report to a matching group (or open one) and wait until it is flushed. Returns this report's result."""
+        loop = asyncio.get_running_loop()
+        group = self._match(key, terms)
+        if group is None:
+            group = {"reports": [], "futures": [], "terms": [], "timer": None}
+            self._groups.setdefault(key, []).append(group)
+            group["timer"] = loop.call_later(self.window, self._close, key, group)
+        future = loop.create_future()
+        group["reports"].append(report)
+        group["futures"].append(future)
+        if terms is not None:
+            group["terms"].append(terms)
+        if len(group["reports"]) >= self.max_group:
+            self._close(key, group)
+        return await future
+
+    def _close(self, key: str, group: dict) -> None:
+        open_groups = self._groups.get(key, [])
+        if group in open_groups:
+            open_groups.remove(group)
+            if not open_groups:
+                del self._groups[key]
+        if group["timer"] is not None:
+            group["timer"].cancel()
+            group["timer"] = None
+        task = asyncio.ensure_future(self._run(group))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group: dict) -> None:
+        futures = group["futures"]
+        try:
+            results = await self._flush(group["reports"])
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if future.done():
+                continue
+            # flush may fail some reports of a group and not others
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def drain(self) -> None:
+        """Flush every open group now and wait for all flushes (used on shutdown)."""
+        for key, open_groups in list(self._groups.items()):
+            for group in list(open_groups):
+                self._close(key, group)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
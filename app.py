@@ -1,59 +1,121 @@
-from fastapi import FastAPI, Request, HTTPException, Form, File, UploadFile, Body
-from fastapi.responses import HTMLResponse
-from fastapi.staticfiles import StaticFiles
+import asyncio
+import hmac
+import os
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI, Request, HTTPException, Form, File, UploadFile, Body, Depends
+from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse
 from fastapi.templating import Jinja2Templates
 
-from config import JIRA_PROJECT, JIRA_EPIC_LINK, JIRA_LABELS, DEFAULT_CHAT_COMPONENT_NAME, DEFAULT_CHAT_COMPONENT_ID
+from config import (
+    ADMIN_TOKEN, FAST_JSON, JIRA_PROJECT, JIRA_EPIC_LINK, JIRA_LABELS, DEFAULT_CHAT_COMPONENT_NAME, DEFAULT_CHAT_COMPONENT_ID,
+    AGGREGATE_WINDOW_SECONDS, AGGREGATE_MAX_GROUP, AGGREGATE_GROUP_BY, AGGREGATE_KEYWORDS, AGGREGATE_SIMILARITY,
+)
 from jira_client import (
-    create_issue, get_components, get_priorities, get_assignable_users, add_attachments,
+    create_issue, get_components, get_priorities, get_assignable_users, add_attachments, add_comment,
     get_default_chat_component_id, get_user_account_id_by_name, get_priority_id_by_name
 )
-from llm_client import generate_summary_only
+import ledger
+import profiling
+from http_cache import (
+    METADATA_CACHE_CONTROL, CompressedStaticFiles, FastJSONResponse, json_response, page_response,
+)
+from profiling import ProfilingMiddleware, run_in_threadpool, stage
+from llm_client import summarize
+from summarizer import summary_stats
 from chat_utils import extract_customer_name, message_has_trigger, extract_assignee, extract_priority, clean_message_for_jira
 
-app = FastAPI(title="Feedback to Jira")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if burst_aggregator is not None:
+        await burst_aggregator.drain()
+    ledger.close()
+
+
+app = FastAPI(
+    title="Feedback to Jira",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if FAST_JSON else JSONResponse,
+)
+app.add_middleware(ProfilingMiddleware)
+app.mount("/static", CompressedStaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
-    return templates.TemplateResponse(
-        "index.html",
-        {"request": request, "project": JIRA_PROJECT, "epic": JIRA_EPIC_LINK, "labels": JIRA_LABELS},
+    return page_response(
+        request.headers, templates.env, "index.html",
+        project=JIRA_PROJECT, epic=JIRA_EPIC_LINK, labels=JIRA_LABELS,
     )
 
 
 @app.get("/test-teams", response_class=HTMLResponse)
 async def test_teams(request: Request):
     """Test page: simulate a Teams message and create Jira without needing Teams."""
-    return templates.TemplateResponse("test-teams.html", {"request": request})
+    return page_response(request.headers, templates.env, "test-teams.html")
 
 
 @app.get("/api/components")
-async def api_components():
+async def api_components(request: Request):
     try:
-        return get_components(JIRA_PROJECT)
+        components = await run_in_threadpool(get_components, JIRA_PROJECT)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
+    return json_response(request.headers, components, METADATA_CACHE_CONTROL)
 
 
 @app.get("/api/priorities")
-async def api_priorities():
+async def api_priorities(request: Request):
     try:
-        return get_priorities()
+        priorities = await run_in_threadpool(get_priorities)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
+    return json_response(request.headers, priorities, METADATA_CACHE_CONTROL)
 
 
 @app.get("/api/assignable-users")
 async def api_assignable_users(query: str = ""):
     try:
-        return get_assignable_users(JIRA_PROJECT, query)
+        return await run_in_threadpool(get_assignable_users, JIRA_PROJECT, query)
     except Exception as e:
         raise HTTPException(status_code=502, detail=str(e))
 
 
+@app.get("/api/summary-stats")
+async def api_summary_stats():
+    """How often issue titles came from the local summarizer, Groq, or the local fallback."""
+    return summary_stats()
+
+
+# Plain def: SQLite queries run in the threadpool (ledger keeps one read connection per thread)
+@app.get("/issues/recent")
+def issues_recent(limit: int = 20, before: int | None = None):
+    """Issues created by this app, newest first (local ledger). Pass next_cursor as before for the next page."""
+    if not ledger.enabled():
+        raise HTTPException(status_code=404, detail="Issue ledger is disabled (LEDGER_DB_PATH is empty or unusable)")
+    try:
+        return ledger.recent(limit=limit, before=before)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=503, detail=f"Issue ledger unavailable: {e}")
+
+
+@app.get("/issues/search")
+def issues_search(q: str, limit: int = 20, before: int | None = None):
+    """Full-text search over summary, message and customer of issues created by this app."""
+    if not ledger.enabled():
+        raise HTTPException(status_code=404, detail="Issue ledger is disabled (LEDGER_DB_PATH is empty or unusable)")
+    try:
+        return ledger.search(q, limit=limit, before=before)
+    except sqlite3.Error as e:
+        raise HTTPException(status_code=503, detail=f"Issue ledger unavailable: {e}")
+
+
 @app.post("/create-jira")
 async def create_jira_endpoint(
     feedback: str = Form(..., description="Description (used as-is in Jira)"),
@@ -70,12 +132,13 @@ async def create_jira_endpoint(
     feedback = (feedback or "").strip()
     if not feedback:
         raise HTTPException(status_code=422, detail="Feedback is required")
-    try:
-        summary = generate_summary_only(feedback)
-    except ValueError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+    started = time.perf_counter()
+    with stage("summary"):
+        summary = await run_in_threadpool(summarize, feedback, customer_name)
+    summary_ms = round((time.perf_counter() - started) * 1000, 1)
     description = feedback
-    key, url = create_issue(
+    key, url = await run_in_threadpool(
+        create_issue,
         summary,
         description,
         sprint=sprint,
@@ -86,17 +149,20 @@ async def create_jira_endpoint(
         module=module or None,
         customer_reported_bug=customer_reported_bug or None,
         customer_name=customer_name or None,
+        source="form",
+        timings={"summary_ms": summary_ms},
     )
     files_to_attach = []
-    for f in (screenshots or [])[:4]:
-        if f.filename:
-            content = await f.read()
-            if content:
-                ct = f.content_type or "application/octet-stream"
-                files_to_attach.append((f.filename, content, ct))
+    with stage("attachments_read"):
+        for f in (screenshots or [])[:4]:
+            if f.filename:
+                content = await f.read()
+                if content:
+                    ct = f.content_type or "application/octet-stream"
+                    files_to_attach.append((f.filename, content, ct))
     if files_to_attach:
         try:
-            add_attachments(key, files_to_attach)
+            await run_in_threadpool(add_attachments, key, files_to_attach)
         except ValueError as e:
             pass
     return {"key": key, "url": url}
@@ -123,63 +189,132 @@ async def _create_jira_from_chat_impl(
             detail="Message must contain #ZProdBug or #TeamsJIRABugBot. Use skip_trigger_check=true to test without trigger.",
         )
 
-    customer_name = (customer_name_override or "").strip() if customer_name_override else None
-    if not customer_name:
-        customer_name = extract_customer_name(message)
-
-    assignee_name = extract_assignee(message, default="Aeras Alvi")
-    assignee_account_id = get_user_account_id_by_name(JIRA_PROJECT, assignee_name)
-
-    priority_name = extract_priority(message)
-    priority_id = get_priority_id_by_name(priority_name) if priority_name else None
-
-    cleaned_message = clean_message_for_jira(message)
-
-    try:
-        summary = generate_summary_only(cleaned_message)
-    except ValueError as e:
-        raise HTTPException(status_code=503, detail=str(e))
+    with stage("parse_message"):
+        customer_name = (customer_name_override or "").strip() if customer_name_override else None
+        if not customer_name:
+            customer_name = extract_customer_name(message)
+        report = {
+            "message": clean_message_for_jira(message),
+            "customer_name": customer_name or "NA",
+            "assignee": extract_assignee(message, default="Aeras Alvi"),
+            "priority": extract_priority(message),
+            "files": [],
+        }
+
+    with stage("attachments_read"):
+        for f in (screenshot_files or [])[:4]:
+            if f and getattr(f, "filename", None):
+                content = await f.read()
+                if content:
+                    ct = getattr(f, "content_type", None) or "application/octet-stream"
+                    report["files"].append((f.filename, content, ct))
+
+    if burst_aggregator is None:
+        return (await _create_chat_issue([report]))[0]
+    key = group_key(report["customer_name"], AGGREGATE_GROUP_BY)
+    terms = report_terms(report["message"], AGGREGATE_GROUP_BY, AGGREGATE_KEYWORDS)
+    return await burst_aggregator.submit(key, report, terms)
+
+
+async def _create_chat_issue(reports: list[dict]) -> list[dict]:
+    """
+    Create one issue for a group of chat reports (one report unless burst aggregation is on).
+    The first report becomes the issue; the others are added as a single comment and all
+    screenshots are uploaded in one request. If that comment cannot be added, each other report
+    gets its own issue instead. Returns one result per report (an exception for a report whose
+    own issue failed).
+    """
+    lead = reports[0]
+    with stage("jira_lookups"):
+        assignee_account_id = await run_in_threadpool(get_user_account_id_by_name, JIRA_PROJECT, lead["assignee"])
+        priority_id = (
+            await run_in_threadpool(get_priority_id_by_name, lead["priority"]) if lead["priority"] else None
+        )
 
-    component_id = get_default_chat_component_id(
-        JIRA_PROJECT,
-        [DEFAULT_CHAT_COMPONENT_NAME, "RA FE", "RA-FE"],
-        fallback_id=DEFAULT_CHAT_COMPONENT_ID or None,
-    )
+    started = time.perf_counter()
+    with stage("summary"):
+        summary = await run_in_threadpool(summarize, lead["message"], lead["customer_name"])
+    summary_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    with stage("jira_lookups"):
+        component_id = await run_in_threadpool(
+            get_default_chat_component_id,
+            JIRA_PROJECT,
+            [DEFAULT_CHAT_COMPONENT_NAME, "RA FE", "RA-FE"],
+            fallback_id=DEFAULT_CHAT_COMPONENT_ID or None,
+        )
     if not component_id:
         raise HTTPException(
             status_code=503,
             detail="Project requires a component. Set DEFAULT_CHAT_COMPONENT_ID in .env to your RA_FE component id, or add a component to the project.",
         )
 
-    key, url = create_issue(
+    key, url = await run_in_threadpool(
+        create_issue,
         summary,
-        cleaned_message,
+        lead["message"],
         component_id=component_id,
         priority_id=priority_id,
         assignee_account_id=assignee_account_id,
-        customer_name=customer_name or "NA",
+        customer_name=lead["customer_name"],
+        source="chat" if len(reports) == 1 else "chat:aggregated",
+        timings={"summary_ms": summary_ms},
+        ledger_assignee=lead["assignee"],
+        ledger_priority=lead["priority"],
     )
 
-    files_to_attach = []
-    for f in (screenshot_files or [])[:4]:
-        if f and getattr(f, "filename", None):
-            content = await f.read()
-            if content:
-                ct = getattr(f, "content_type", None) or "application/octet-stream"
-                files_to_attach.append((f.filename, content, ct))
+    related = reports[1:]
+    separate: list = []
+    if related:
+        lines = [f"{len(related)} related report(s) received within the aggregation window:"]
+        for n, r in enumerate(related, 2):
+            lines += [
+                "",
+                f"Report {n} (customer: {r['customer_name']}, assignee: {r['assignee']},"
+                f" priority: {r['priority'] or 'not set'}):",
+                r["message"],
+            ]
+        try:
+            await run_in_threadpool(add_comment, key, "\n".join(lines))
+        except (ValueError, httpx.HTTPError):
+            # The related reports are not on this issue; rather than lose them, create one issue each
+            separate = await asyncio.gather(*(_create_chat_issue([r]) for r in related), return_exceptions=True)
+            related = []
+
+    files_to_attach = [f for r in (lead, *related) for f in r["files"]]
     if files_to_attach:
         try:
-            add_attachments(key, files_to_attach)
-        except ValueError:
+            await run_in_threadpool(add_attachments, key, files_to_attach, limit=len(files_to_attach))
+        except (ValueError, httpx.HTTPError):
             pass
 
-    return {
+    result = {
         "key": key,
         "url": url,
-        "customer_name": customer_name or "NA",
-        "assignee": assignee_name,
-        "priority": priority_name,
+        "customer_name": lead["customer_name"],
+        "assignee": lead["assignee"],
+        "priority": lead["priority"],
     }
+    if burst_aggregator is None:
+        return [result]
+    group_size = 1 + len(related)
+    return [
+        {**result, "aggregated": group_size > 1, "group_size": group_size, "report_index": n}
+        for n in range(1, group_size + 1)
+    ] + [r if isinstance(r, BaseException) else r[0] for r in separate]
+
+
+burst_aggregator = None
+if AGGREGATE_WINDOW_SECONDS > 0:
+    from aggregator import GROUP_BY_CHOICES, BurstAggregator, group_key, report_terms
+
+    if AGGREGATE_GROUP_BY not in GROUP_BY_CHOICES:
+        raise ValueError(
+            f"AGGREGATE_GROUP_BY must be one of {', '.join(GROUP_BY_CHOICES)}; got {AGGREGATE_GROUP_BY!r}"
+        )
+    burst_aggregator = BurstAggregator(
+        _create_chat_issue, AGGREGATE_WINDOW_SECONDS, AGGREGATE_MAX_GROUP, AGGREGATE_SIMILARITY
+    )
 
 
 @app.post("/add-attachment/{issue_key}")
@@ -202,7 +337,7 @@ async def add_attachment_to_issue(
 
     ct = file.content_type or "application/octet-stream"
     try:
-        add_attachments(issue_key.strip(), [(file.filename, content, ct)])
+        await run_in_threadpool(add_attachments, issue_key.strip(), [(file.filename, content, ct)])
     except ValueError as e:
         raise HTTPException(status_code=502, detail=str(e))
 
@@ -225,12 +360,14 @@ async def create_jira_from_chat(request: Request):
     screenshot_files: list[UploadFile] = []
 
     if content_type == "application/json":
-        body = await request.json()
+        with stage("json_parse"):
+            body = await request.json()
         message = (body.get("message") or "").strip()
         customer_name_override = body.get("customer_name")
         skip_trigger_check = _parse_skip_trigger(body.get("skip_trigger_check"))
     else:
-        form = await request.form()
+        with stage("multipart_parse"):
+            form = await request.form()
         message = (form.get("message") or "").strip()
         customer_name_override = form.get("customer_name")
         skip_trigger_check = _parse_skip_trigger(form.get("skip_trigger_check"))
@@ -247,3 +384,76 @@ async def create_jira_from_chat(request: Request):
     return await _create_jira_from_chat_impl(
         message, customer_name_override, skip_trigger_check, screenshot_files
     )
+
+
+def _require_admin(request: Request) -> None:
+    """Admin endpoints need X-Admin-Token matching ADMIN_TOKEN; they don't exist when it is unset."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = request.headers.get("x-admin-token") or ""
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.get("/admin/profiling", dependencies=[Depends(_require_admin)])
+async def admin_profiling_settings():
+    """Profiling settings of the worker that served this request (settings are per worker process)."""
+    return {**profiling.settings, "worker_pid": os.getpid()}
+
+
+@app.post("/admin/profiling", dependencies=[Depends(_require_admin)])
+async def admin_profiling_update(request: Request):
+    """
+    Change profiling at runtime. Body (all optional):
+      { "sample_rate": 0.01, "slow_ms": 2000, "profile_next": 1 }
+    sample_rate: fraction of requests to stack-sample; slow_ms: save traced requests slower than this
+    (0 disables); profile_next: force-profile the next N requests.
+    Only the worker process that receives this request changes; worker_pid in the reply says which.
+    The body is parsed here, after the admin check, so unauthenticated callers never see validation errors.
+    """
+    try:
+        body = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Body must be a JSON object")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=422, detail="Body must be a JSON object")
+    try:
+        if "sample_rate" in body:
+            profiling.settings["sample_rate"] = min(1.0, max(0.0, float(body["sample_rate"])))
+        if "slow_ms" in body:
+            profiling.settings["slow_ms"] = max(0.0, float(body["slow_ms"]))
+        if "profile_next" in body:
+            profiling.settings["profile_next"] = max(0, int(body["profile_next"]))
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {**profiling.settings, "worker_pid": os.getpid()}
+
+
+@app.get("/admin/profiles", dependencies=[Depends(_require_admin)])
+async def admin_profiles():
+    """Saved request profiles (newest first)."""
+    return profiling.list_captures()
+
+
+@app.get("/admin/profiles/{capture_id}", dependencies=[Depends(_require_admin)])
+async def admin_profile(capture_id: str, format: str = "speedscope"):
+    """
+    One saved profile. format: "speedscope" (open at https://www.speedscope.app),
+    "collapsed" (flamegraph.pl / speedscope collapsed stacks) or "json" (raw capture).
+    """
+    capture = profiling.load_capture(capture_id)
+    if capture is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(
+            profiling.to_collapsed(capture),
+            headers={"Content-Disposition": f'attachment; filename="{capture_id}.collapsed.txt"'},
+        )
+    if format == "speedscope":
+        return JSONResponse(
+            profiling.to_speedscope(capture),
+            headers={"Content-Disposition": f'attachment; filename="{capture_id}.speedscope.json"'},
+        )
+    if format == "json":
+        return capture
+    raise HTTPException(status_code=422, detail="format must be speedscope, collapsed or json")
@@ -0,0 +1,73 @@
+"""
+Bytes on the wire and requests/second for the pages and metadata APIs the web form loads.
+
+Runs the app in-process (httpx ASGI transport) with Jira calls replaced by fixed data, so it
+works offline and can be run against any revision of app.py:
+
+    python benchmarks/bench_http_cache.py [iterations]
+
+Client profiles:
+  plain        no Accept-Encoding, no validators (what every request cost before caching)
+  compressed   first visit of a browser (Accept-Encoding: br, gzip)
+  revalidated  repeat visit: If-None-Match with the ETag from the first visit
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import os  # noqa: E402
+
+os.chdir(ROOT)
+
+import httpx  # noqa: E402
+
+import app as app_module  # noqa: E402
+
+COMPONENTS = [{"id": str(10000 + i), "name": f"Component {i} - Recruiter Frontend"} for i in range(60)]
+PRIORITIES = [{"id": str(i), "name": n} for i, n in enumerate(["Highest", "High", "Medium", "Low", "Lowest"], 1)]
+app_module.get_components = lambda project_key: COMPONENTS
+app_module.get_priorities = lambda: PRIORITIES
+
+PATHS = ["/", "/test-teams", "/api/components", "/api/priorities"]
+
+
+def _wire_size(response: httpx.Response, raw: bytes) -> int:
+    status_line = len(f"HTTP/1.1 {response.status_code} {response.reason_phrase}\r\n")
+    headers = sum(len(k) + len(v) + 4 for k, v in response.headers.raw)
+    return status_line + headers + 2 + len(raw)
+
+
+async def _get(client: httpx.AsyncClient, path: str, headers: dict) -> tuple[httpx.Response, bytes]:
+    async with client.stream("GET", path, headers=headers) as r:
+        raw = b"".join([chunk async for chunk in r.aiter_raw()])
+    return r, raw
+
+
+async def main(iterations: int) -> None:
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{'path':<18}{'profile':<13}{'status':>7}{'bytes':>9}{'req/s':>10}")
+        for path in PATHS:
+            first, _ = await _get(client, path, {"Accept-Encoding": "br, gzip"})
+            etag = first.headers.get("etag")
+            profiles = {
+                "plain": {"Accept-Encoding": "identity"},
+                "compressed": {"Accept-Encoding": "br, gzip"},
+            }
+            if etag:
+                profiles["revalidated"] = {"Accept-Encoding": "br, gzip", "If-None-Match": etag}
+            for name, headers in profiles.items():
+                r, raw = await _get(client, path, headers)
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    await _get(client, path, headers)
+                rps = iterations / (time.perf_counter() - started)
+                print(f"{path:<18}{name:<13}{r.status_code:>7}{_wire_size(r, raw):>9}{rps:>10.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 500))
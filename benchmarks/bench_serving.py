@@ -0,0 +1,148 @@
+"""
+Throughput of serving settings against the current default, with Jira/Groq replaced by
+benchmarks/upstream_stub.py (started automatically on a local port).
+
+    python benchmarks/bench_serving.py [--duration 10] [--concurrency 32]
+
+Each configuration starts the app in a subprocess, drives a mixed load for --duration
+seconds and reports requests/second and latency percentiles:
+  GET  /api/priorities          (one upstream call + JSON)
+  GET  /issues/recent           (local ledger + JSON, no upstream)
+  POST /create-jira-from-chat   (lookups + Groq + create; SUMMARY_MODE=llm)
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# name -> (command, extra env). The first entry is the current default.
+CONFIGS = {
+    "default (uvicorn app:app)": (["uvicorn", "app:app"], {"FAST_JSON": "0"}),
+    "asyncio + h11": (["uvicorn", "app:app", "--loop", "asyncio", "--http", "h11"], {"FAST_JSON": "0"}),
+    "uvloop + httptools + orjson": (["uvicorn", "app:app", "--loop", "uvloop", "--http", "httptools"], {}),
+    "production profile": ([sys.executable, "serve.py"], {"SERVE_PROFILE": "production"}),
+}
+
+REQUESTS = [
+    ("GET", "/api/priorities", None),
+    ("GET", "/issues/recent", None),
+    ("POST", "/create-jira-from-chat", {"message": "#ZProdBug Login page crashes on Safari after SSO redirect"}),
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def _stop(proc: subprocess.Popen) -> None:
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(timeout=40)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+async def _load(base_url: str, duration: float, concurrency: int) -> tuple[int, int, list[float]]:
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+
+        async def worker(offset: int) -> None:
+            nonlocal errors
+            i = offset
+            while time.monotonic() < deadline:
+                method, path, body = REQUESTS[i % len(REQUESTS)]
+                i += 1
+                started = time.perf_counter()
+                try:
+                    r = await client.request(method, path, json=body)
+                    if r.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return len(latencies), errors, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="stub upstream latency")
+    args = parser.parse_args()
+
+    stub_port = _free_port()
+    stub = subprocess.Popen(
+        ["uvicorn", "benchmarks.upstream_stub:app", "--port", str(stub_port), "--log-level", "warning"],
+        cwd=ROOT,
+        env={**os.environ, "STUB_LATENCY_MS": str(args.latency_ms)},
+    )
+    try:
+        _wait_ready(f"http://127.0.0.1:{stub_port}/docs")
+        print(f"{'configuration':<32}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'errors':>8}")
+        for name, (command, extra_env) in CONFIGS.items():
+            port = _free_port()
+            with tempfile.TemporaryDirectory() as data_dir:
+                env = {
+                    **os.environ,
+                    "JIRA_BASE_URL": f"http://127.0.0.1:{stub_port}",
+                    "GROQ_API_URL": f"http://127.0.0.1:{stub_port}/openai/v1/chat/completions",
+                    "GROQ_API_KEY": "stub",
+                    "SUMMARY_MODE": "llm",
+                    "LEDGER_DB_PATH": os.path.join(data_dir, "ledger.db"),
+                    "HOST": "127.0.0.1",
+                    "PORT": str(port),
+                    **extra_env,
+                }
+                if command[0] == "uvicorn":
+                    command = command + ["--host", "127.0.0.1", "--port", str(port), "--no-access-log"]
+                proc = subprocess.Popen(
+                    command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                try:
+                    base_url = f"http://127.0.0.1:{port}"
+                    _wait_ready(base_url + "/api/summary-stats")
+                    asyncio.run(_load(base_url, 1.0, args.concurrency))  # warm-up
+                    count, errors, latencies = asyncio.run(_load(base_url, args.duration, args.concurrency))
+                finally:
+                    _stop(proc)
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+            print(
+                f"{name:<32}{count / args.duration:>9.1f}{quantiles[49] * 1000:>9.1f}"
+                f"{quantiles[98] * 1000:>9.1f}{errors:>8}"
+            )
+    finally:
+        _stop(stub)
+
+
+if __name__ == "__main__":
+    main()
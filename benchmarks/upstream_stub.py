@@ -0,0 +1,69 @@
+"""
+Local stand-in for Jira Cloud and Groq, for benchmarks (no credentials, no network).
+
+    STUB_LATENCY_MS=40 uvicorn benchmarks.upstream_stub:app --port 9100
+
+Point the app at it with JIRA_BASE_URL=http://127.0.0.1:9100 and
+GROQ_API_URL=http://127.0.0.1:9100/openai/v1/chat/completions (any GROQ_API_KEY).
+"""
+import asyncio
+import itertools
+import os
+
+from fastapi import FastAPI, Request
+
+LATENCY = float(os.getenv("STUB_LATENCY_MS", "40")) / 1000
+
+app = FastAPI(title="Jira/Groq stub")
+_keys = itertools.count(1)
+
+COMPONENTS = [{"id": str(10000 + i), "name": "RA_FE" if i == 0 else f"Component {i}"} for i in range(60)]
+PRIORITIES = [{"id": str(i), "name": n} for i, n in enumerate(["Highest", "High", "Medium", "Low", "Lowest"], 1)]
+USERS = [{"accountId": "acc-1", "displayName": "Aeras Alvi", "emailAddress": "aeras@example.com"}]
+
+
+@app.get("/rest/api/3/project/{project_key}/components")
+async def components(project_key: str):
+    await asyncio.sleep(LATENCY)
+    return COMPONENTS
+
+
+@app.get("/rest/api/3/priority")
+async def priorities():
+    await asyncio.sleep(LATENCY)
+    return PRIORITIES
+
+
+@app.get("/rest/api/3/user/assignable/search")
+async def assignable():
+    await asyncio.sleep(LATENCY)
+    return USERS
+
+
+@app.post("/rest/api/3/issue", status_code=201)
+async def create_issue(request: Request):
+    await request.body()
+    await asyncio.sleep(LATENCY * 3)
+    key = f"ZRA-{next(_keys)}"
+    return {"id": key, "key": key}
+
+
+@app.post("/rest/api/3/issue/{issue_key}/attachments")
+async def attachments(issue_key: str, request: Request):
+    await request.body()
+    await asyncio.sleep(LATENCY * 2)
+    return []
+
+
+@app.post("/rest/api/3/issue/{issue_key}/comment", status_code=201)
+async def comment(issue_key: str, request: Request):
+    await request.body()
+    await asyncio.sleep(LATENCY)
+    return {"id": "1"}
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    await request.body()
+    await asyncio.sleep(LATENCY * 5)
+    return {"choices": [{"message": {"content": "SUMMARY: Login page crashes on Safari after SSO redirect"}}]}
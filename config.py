@@ -30,3 +30,36 @@ DEFAULT_CHAT_COMPONENT_ID = os.getenv("DEFAULT_CHAT_COMPONENT_ID", "").strip()
 # Free hosted LLM (Groq - free tier, no local setup)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions").strip()
+
+# Issue titles: "auto" (local for short/structured messages, Groq otherwise), "local" or "llm".
+# Local extractive summarizer is also the fallback when Groq is unset or unavailable.
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "auto").strip().lower()
+
+# Local ledger of created issues (SQLite + FTS5) backing /issues/recent and /issues/search. Empty disables it.
+LEDGER_DB_PATH = os.getenv("LEDGER_DB_PATH", str(Path(__file__).resolve().parent / "data" / "ledger.db")).strip()
+
+# Admin endpoints (/admin/...) require header X-Admin-Token with this value. Empty disables them.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "").strip()
+
+# Request profiling: X-Profile header signed with PROFILE_SECRET forces a profile; PROFILE_SAMPLE_RATE
+# (0..1) profiles a fraction of requests; any traced request slower than PROFILE_SLOW_MS is saved.
+PROFILE_SECRET = os.getenv("PROFILE_SECRET", "").strip()
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0") or 0)
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0") or 0)
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5") or 5)
+PROFILE_DIR = os.getenv("PROFILE_DIR", str(Path(__file__).resolve().parent / "data" / "profiles")).strip()
+PROFILE_RING_SIZE = int(os.getenv("PROFILE_RING_SIZE", "50") or 50)
+
+# Burst aggregation for /create-jira-from-chat: hold reports for this many seconds (0 disables) and
+# create one issue per group (same customer, overlapping message keywords); the rest become one comment.
+AGGREGATE_WINDOW_SECONDS = float(os.getenv("AGGREGATE_WINDOW_SECONDS", "0") or 0)
+AGGREGATE_MAX_GROUP = int(os.getenv("AGGREGATE_MAX_GROUP", "10") or 10)
+# "customer+keywords" (default), "customer" or "keywords"; anything else stops startup when aggregation is on
+AGGREGATE_GROUP_BY = os.getenv("AGGREGATE_GROUP_BY", "customer+keywords").strip().lower()
+# Keywords taken from each message, and the keyword-set overlap (Jaccard, 0..1) needed to join a group
+AGGREGATE_KEYWORDS = int(os.getenv("AGGREGATE_KEYWORDS", "6") or 6)
+AGGREGATE_SIMILARITY = float(os.getenv("AGGREGATE_SIMILARITY", "0.5") or 0.5)
+
+# Render JSON responses with orjson when installed (compact stdlib json otherwise); FAST_JSON=0 restores FastAPI's default
+FAST_JSON = os.getenv("FAST_JSON", "1").strip().lower() not in ("0", "false", "no", "off")
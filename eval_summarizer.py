@@ -0,0 +1,103 @@
+"""
+Offline evaluation: compare local extractive titles with Groq titles on a sample corpus.
+
+Usage:
+    python eval_summarizer.py [corpus.jsonl] [--local-only]
+
+Corpus is JSON Lines with a "message" field (optionally "reference" for a hand-written title).
+Without GROQ_API_KEY (or with --local-only) only local titles, routing and timings are reported.
+Rows where Groq fails or gives no SUMMARY line are reported as skipped and never used as references.
+"""
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+from chat_utils import clean_message_for_jira
+from config import GROQ_API_KEY
+from llm_client import _groq_summary
+from summarizer import MAX_TITLE_LENGTH, extractive_summary, prefers_local
+
+DEFAULT_CORPUS = Path(__file__).resolve().parent / "samples" / "summary_corpus.jsonl"
+
+
+def _tokens(text: str) -> set[str]:
+    return {w.lower() for w in re.findall(r"[A-Za-z0-9]+", text or "")}
+
+
+def token_f1(candidate: str, reference: str) -> float:
+    """Unigram overlap F1 between two titles (a cheap ROUGE-1 stand-in)."""
+    cand, ref = _tokens(candidate), _tokens(reference)
+    common = len(cand & ref)
+    if not common:
+        return 0.0
+    precision, recall = common / len(cand), common / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def load_corpus(path: Path) -> list[dict]:
+    rows = []
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                rows.append(json.loads(line))
+    return rows
+
+
+def main(argv: list[str]) -> int:
+    local_only = "--local-only" in argv
+    args = [a for a in argv if not a.startswith("--")]
+    corpus = load_corpus(Path(args[0]) if args else DEFAULT_CORPUS)
+    use_llm = bool(GROQ_API_KEY) and not local_only
+
+    local_times, llm_times, f1_scores = [], [], []
+    routed_local = llm_skipped = 0
+    for i, row in enumerate(corpus, 1):
+        message = clean_message_for_jira(row.get("message") or "")
+        t0 = time.perf_counter()
+        local = extractive_summary(message)
+        local_times.append(time.perf_counter() - t0)
+        route = "local" if prefers_local(message) else "llm"
+        routed_local += route == "local"
+        reference = row.get("reference")
+        llm = llm_error = None
+        if use_llm:
+            t0 = time.perf_counter()
+            try:
+                llm = _groq_summary(message)
+            except Exception as e:
+                llm_error = str(e)
+            llm_times.append(time.perf_counter() - t0)
+            if llm is None:
+                llm_skipped += 1
+            reference = reference or llm
+        print(f"[{i}] route={route}")
+        print(f"    local: {local}")
+        if llm is not None:
+            print(f"    llm:   {llm}")
+        elif use_llm:
+            print(f"    llm:   skipped ({llm_error or 'no SUMMARY line'})")
+        if reference:
+            f1 = token_f1(local, reference)
+            f1_scores.append(f1)
+            print(f"    f1:    {f1:.2f}")
+        if len(local) > MAX_TITLE_LENGTH:
+            print(f"    WARNING: local title is {len(local)} chars")
+
+    n = len(corpus) or 1
+    print()
+    print(f"messages:          {len(corpus)}")
+    print(f"routed local:      {routed_local} ({routed_local / n:.0%})")
+    print(f"local avg time:    {sum(local_times) / n * 1e6:.1f} µs")
+    if llm_times:
+        print(f"llm avg time:      {sum(llm_times) / len(llm_times) * 1e3:.1f} ms")
+        print(f"llm skipped:       {llm_skipped}")
+    if f1_scores:
+        print(f"local vs ref F1:   {sum(f1_scores) / len(f1_scores):.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,37 @@
+# gunicorn settings for SERVE_PROFILE=production (see serve.py). Override with env vars.
+import os
+
+from config import AGGREGATE_WINDOW_SECONDS
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+
+# Containers usually report the host's CPUs, so the default is a fixed 2 rather than a CPU formula.
+# Burst aggregation groups (and admin runtime toggles) live in each worker, so with
+# AGGREGATE_WINDOW_SECONDS > 0 the default is 1 worker; more workers split a burst across groups.
+workers = int(os.getenv("WEB_CONCURRENCY", "0") or 0) or (1 if AGGREGATE_WINDOW_SECONDS > 0 else 2)
+worker_class = "serve.ProductionWorker"
+
+# Import the app once in the master; workers fork with modules already loaded
+preload_app = True
+
+# Give in-flight requests (Jira creates, aggregation windows) time to finish on SIGTERM / redeploy
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", "30") or 30)
+timeout = int(os.getenv("WORKER_TIMEOUT", "120") or 120)
+keepalive = 5
+
+# Recycle workers occasionally to cap memory growth
+max_requests = int(os.getenv("MAX_REQUESTS", "2000") or 0)
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    if AGGREGATE_WINDOW_SECONDS > 0 and workers > 1:
+        server.log.warning(
+            "Burst aggregation is per worker: with %d workers one burst can become up to %d issues; "
+            "set WEB_CONCURRENCY=1 to aggregate across all requests",
+            workers,
+            workers,
+        )
@@ -0,0 +1,243 @@
+"""
+HTTP caching and compression helpers: content-hash ETags, 304 handling, gzip/brotli negotiation,
+pre-rendered pages and pre-compressed static files.
+
+    python http_cache.py [static_dir]   # write .gz/.br next to compressible static files
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import sys
+from collections import OrderedDict
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, JSONResponse, Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+# Static files have no fingerprint in their names, so keep max-age moderate
+STATIC_CACHE_CONTROL = "public, max-age=3600"
+# Pages only change on deploy/config change: always revalidate (cheap 304 via ETag)
+PAGE_CACHE_CONTROL = "no-cache"
+# Jira components/priorities rarely change: reuse for 5 minutes, serve stale while revalidating for an hour
+METADATA_CACHE_CONTROL = "private, max-age=300, stale-while-revalidate=3600"
+
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+# Each encoding is a different representation, so it gets its own ETag: "<hash>", "<hash>-br", "<hash>-gz"
+_ETAG_SUFFIXES = {None: "", "br": "-br", "gzip": "-gz"}
+
+
+def encode_json(data) -> bytes:
+    """Compact JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with encode_json (orjson when installed)."""
+
+    def render(self, content) -> bytes:
+        return encode_json(content)
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag derived from the content hash."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def negotiate_encoding(accept_encoding: str | None, available=("br", "gzip")) -> str | None:
+    """Pick br or gzip from an Accept-Encoding header (honouring q=0); None means identity."""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for encoding in available:
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def if_none_match(headers: Headers, *etags: str) -> bool:
+    """True if the request's If-None-Match matches any of etags (weak comparison, as RFC 9110 requires)."""
+    value = headers.get("if-none-match")
+    if not value:
+        return False
+    if value.strip() == "*":
+        return True
+    bare = {etag.removeprefix("W/") for etag in etags}
+    return any(tag.strip().removeprefix("W/") in bare for tag in value.split(","))
+
+
+class Representation:
+    """A response body with pre-computed gzip/brotli variants and one ETag per encoding."""
+
+    __slots__ = ("body", "etag", "etags", "media_type", "variants")
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self.etag = etag_for(body)
+        self.variants: dict[str, bytes] = {}
+        if len(body) >= MIN_COMPRESS_SIZE and media_type.startswith(COMPRESSIBLE_TYPES):
+            self.variants["gzip"] = gzip.compress(body, compresslevel=9, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=11)
+        self.etags = {
+            encoding: self.etag[:-1] + _ETAG_SUFFIXES[encoding] + '"' for encoding in (None, *self.variants)
+        }
+
+    def response(self, request_headers: Headers, cache_control: str, status_code: int = 200) -> Response:
+        """200 with the best encoding the client accepts, or 304 if its cached copy (any encoding) is current."""
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"), tuple(self.variants))
+        headers = {"ETag": self.etags[encoding], "Cache-Control": cache_control}
+        if self.variants:
+            headers["Vary"] = "Accept-Encoding"
+        if if_none_match(request_headers, *self.etags.values()):
+            return Response(status_code=304, headers=headers)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+            return Response(self.variants[encoding], status_code, headers, self.media_type)
+        return Response(self.body, status_code, headers, self.media_type)
+
+
+class RepresentationCache:
+    """Small LRU of representations keyed by anything hashable (e.g. ETag or page + config)."""
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+
+    def get(self, key):
+        rep = self._items.get(key)
+        if rep is not None:
+            self._items.move_to_end(key)
+        return rep
+
+    def put(self, key, rep: Representation) -> Representation:
+        self._items[key] = rep
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+        return rep
+
+
+_json_cache = RepresentationCache()
+_page_cache = RepresentationCache()
+
+
+def json_response(request_headers: Headers, data, cache_control: str) -> Response:
+    """JSON with a content-hash ETag, 304 support and compression. Identical bodies reuse compressed variants."""
+    body = encode_json(data)
+    etag = etag_for(body)
+    rep = _json_cache.get(etag) or _json_cache.put(etag, Representation(body, "application/json"))
+    return rep.response(request_headers, cache_control)
+
+
+def page_response(request_headers: Headers, templates, name: str, **context) -> Response:
+    """Template rendered once per (template, context) and served with ETag/304 and compression."""
+    key = (name, tuple(sorted(context.items())))
+    rep = _page_cache.get(key)
+    if rep is None:
+        html = templates.get_template(name).render(**context).encode("utf-8")
+        rep = _page_cache.put(key, Representation(html, "text/html; charset=utf-8"))
+    return rep.response(request_headers, PAGE_CACHE_CONTROL)
+
+
+def _fresh_variant(path: str, source_mtime: float) -> bool:
+    """True if the pre-compressed file exists and was written after its source last changed."""
+    try:
+        return os.stat(path).st_mtime >= source_mtime
+    except OSError:
+        return False
+
+
+class CompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves foo.css.br / foo.css.gz (written by precompress()) when the client accepts them.
+    A variant older than its source is ignored, so an edited file is never served from a stale .gz/.br.
+    """
+
+    async def get_response(self, path: str, scope) -> Response:
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+        request_headers = Headers(scope=scope)
+        source_mtime = (response.stat_result or os.stat(response.path)).st_mtime
+        available = tuple(
+            e for e, suffix in _SUFFIXES.items() if _fresh_variant(response.path + suffix, source_mtime)
+        )
+        encoding = negotiate_encoding(request_headers.get("accept-encoding"), available)
+        if encoding is None:
+            response.headers["Cache-Control"] = STATIC_CACHE_CONTROL
+            if available:
+                response.headers["Vary"] = "Accept-Encoding"
+            return response
+        variant = response.path + _SUFFIXES[encoding]
+        compressed = FileResponse(
+            variant,
+            stat_result=os.stat(variant),
+            media_type=response.media_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding", "Cache-Control": STATIC_CACHE_CONTROL},
+        )
+        if if_none_match(request_headers, compressed.headers["etag"]):
+            return Response(
+                status_code=304,
+                headers={
+                    "ETag": compressed.headers["etag"],
+                    "Vary": "Accept-Encoding",
+                    "Cache-Control": STATIC_CACHE_CONTROL,
+                },
+            )
+        return compressed
+
+
+def precompress(directory: str) -> int:
+    """Write .gz (and .br if brotli is installed) siblings for compressible files. Returns files written."""
+    written = 0
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if name.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(root, name)
+            media_type = mimetypes.guess_type(name)[0] or ""
+            if not media_type.startswith(COMPRESSIBLE_TYPES) or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+                continue
+            with open(path, "rb") as f:
+                body = f.read()
+            with open(path + ".gz", "wb") as f:
+                f.write(gzip.compress(body, compresslevel=9, mtime=0))
+            written += 1
+            if brotli is not None:
+                with open(path + ".br", "wb") as f:
+                    f.write(brotli.compress(body, quality=11))
+                written += 1
+    return written
+
+
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+    print(f"{precompress(target)} compressed file(s) written under {target}")
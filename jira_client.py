@@ -1,5 +1,8 @@
+import time
+
 import httpx
 
+import ledger
 from config import (
     JIRA_BASE_URL,
     JIRA_EMAIL,
@@ -14,6 +17,7 @@ from config import (
     JIRA_CF_CUSTOMER_NAME,
     JIRA_CF_MODULE,
 )
+from profiling import stage
 
 
 def _auth():
@@ -154,9 +158,15 @@ def create_issue(
     module: str | None = None,
     customer_reported_bug: str | None = None,
     customer_name: str | None = None,
+    source: str | None = None,
+    timings: dict | None = None,
+    ledger_assignee: str | None = None,
+    ledger_priority: str | None = None,
 ) -> tuple[str, str]:
     """
     Create a Jira Bug. Environment, Module, Customer Reported Bug, Customer Name come from form.
+    The created issue is recorded in the local ledger, tagged with source (route) and timings (ms);
+    ledger_assignee / ledger_priority are the human-readable names to record (default: the Jira ids).
     Returns (issue_key, browse_url).
     """
     env_val = (environment or "").strip() or "Production"
@@ -164,11 +174,13 @@ def create_issue(
     crb_val = (customer_reported_bug or "No").capitalize()
     cname_val = (customer_name or "").strip() or "NA"
 
+    with stage("adf_build"):
+        adf = _description_to_atlassian_doc(description)
     body = {
         "fields": {
             "project": {"key": JIRA_PROJECT},
             "summary": _sanitize_summary(summary),
-            "description": _description_to_atlassian_doc(description),
+            "description": adf,
             "issuetype": {"name": JIRA_ISSUE_TYPE},
             "labels": [JIRA_LABELS, "ZProdBug"],
             # Required custom fields (values from form)
@@ -187,7 +199,8 @@ def create_issue(
     if JIRA_EPIC_FIELD_ID:
         body["fields"][JIRA_EPIC_FIELD_ID] = JIRA_EPIC_LINK
 
-    with httpx.Client(timeout=30.0) as client:
+    started = time.perf_counter()
+    with stage("jira_create_http"), httpx.Client(timeout=30.0) as client:
         r = client.post(
             f"{JIRA_BASE_URL}/rest/api/3/issue",
             json=body,
@@ -209,20 +222,31 @@ def create_issue(
         data = r.json()
     key = data["key"]
     url = f"{JIRA_BASE_URL}/browse/{key}"
+    ledger.record_issue(
+        key,
+        url,
+        body["fields"]["summary"],
+        description,
+        customer=cname_val,
+        assignee=ledger_assignee or assignee_account_id or None,
+        priority=ledger_priority or priority_id or None,
+        source=source,
+        timings={**(timings or {}), "jira_create_ms": round((time.perf_counter() - started) * 1000, 1)},
+    )
     return key, url
 
 
-def add_attachments(issue_key: str, files: list[tuple[str, bytes, str]]) -> None:
-    """Attach files to an issue. files = list of (filename, content_bytes, content_type). Max 4 recommended."""
+def add_attachments(issue_key: str, files: list[tuple[str, bytes, str]], limit: int = 4) -> None:
+    """Attach files to an issue in one request. files = list of (filename, content_bytes, content_type). At most limit files."""
     if not files:
         return
     url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}/attachments"
     # Jira expects multipart/form-data with each part named "file"
     file_parts = [
         ("file", (filename, content, content_type))
-        for filename, content, content_type in files[:4]
+        for filename, content, content_type in files[:limit]
     ]
-    with httpx.Client(timeout=60.0) as client:
+    with stage("jira_attach_http"), httpx.Client(timeout=60.0) as client:
         r = client.post(
             url,
             files=file_parts,
@@ -236,3 +260,23 @@ def add_attachments(issue_key: str, files: list[tuple[str, bytes, str]]) -> None
             except Exception:
                 err_detail = r.text or r.reason_phrase
             raise ValueError(f"Jira attachments {r.status_code}: {err_detail}")
+    ledger.record_attachments(issue_key, files[:limit])
+
+
+def add_comment(issue_key: str, text: str) -> None:
+    """Add a plain-text comment (converted to ADF) to an issue."""
+    url = f"{JIRA_BASE_URL}/rest/api/3/issue/{issue_key}/comment"
+    with stage("jira_comment_http"), httpx.Client(timeout=30.0) as client:
+        r = client.post(
+            url,
+            json={"body": _description_to_atlassian_doc(text)},
+            auth=_auth(),
+            headers=_headers(),
+        )
+        if not r.is_success:
+            try:
+                err = r.json()
+                err_detail = err.get("errorMessages", err.get("errors", r.text))
+            except Exception:
+                err_detail = r.text or r.reason_phrase
+            raise ValueError(f"Jira comment {r.status_code}: {err_detail}")
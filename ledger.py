@@ -0,0 +1,293 @@
+"""Local SQLite ledger of created issues, with an FTS5 index for fast search."""
+import json
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from config import LEDGER_DB_PATH
+
+# Writer thread commits at most this many queued rows per transaction, at least every FLUSH_INTERVAL
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5
+MAX_PAGE_SIZE = 100
+# Rows waiting for the writer; beyond this new rows are dropped (with a warning) rather than piling up
+MAX_QUEUED_ROWS = 10000
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS issues (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    url TEXT,
+    created_at REAL NOT NULL,
+    summary TEXT,
+    message TEXT,
+    customer TEXT,
+    assignee TEXT,
+    priority TEXT,
+    source TEXT,
+    timings TEXT
+);
+CREATE TABLE IF NOT EXISTS attachments (
+    id INTEGER PRIMARY KEY,
+    issue_key TEXT NOT NULL,
+    filename TEXT,
+    content_type TEXT,
+    size INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attachments_issue_key ON attachments(issue_key);
+CREATE VIRTUAL TABLE IF NOT EXISTS issues_fts USING fts5(
+    summary, message, customer, key UNINDEXED,
+    content='issues', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS issues_ai AFTER INSERT ON issues BEGIN
+    INSERT INTO issues_fts(rowid, summary, message, customer, key)
+    VALUES (new.id, new.summary, new.message, new.customer, new.key);
+END;
+CREATE TRIGGER IF NOT EXISTS issues_ad AFTER DELETE ON issues BEGIN
+    INSERT INTO issues_fts(issues_fts, rowid, summary, message, customer, key)
+    VALUES ('delete', old.id, old.summary, old.message, old.customer, old.key);
+END;
+"""
+
+_ISSUE_COLUMNS = "id, key, url, created_at, summary, message, customer, assignee, priority, source, timings"
+
+_queue: queue.Queue = queue.Queue(maxsize=MAX_QUEUED_ROWS)
+_writer: threading.Thread | None = None
+_writer_lock = threading.Lock()
+_local = threading.local()
+# Set when the database cannot be opened; the ledger then stays off until restart
+_disabled = False
+
+
+def enabled() -> bool:
+    return bool(LEDGER_DB_PATH) and not _disabled
+
+
+def _connect() -> sqlite3.Connection:
+    Path(LEDGER_DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(LEDGER_DB_PATH, timeout=10.0, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _reader() -> sqlite3.Connection:
+    """Per-thread read connection (WAL lets readers run alongside the writer)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _connect()
+        _local.conn = conn
+    return conn
+
+
+def _write_batch(conn: sqlite3.Connection, batch: list[tuple[str, tuple]]) -> None:
+    issues = [row for kind, row in batch if kind == "issue"]
+    attachments = [row for kind, row in batch if kind == "attachment"]
+    with conn:
+        if issues:
+            conn.executemany(
+                "INSERT OR IGNORE INTO issues"
+                " (key, url, created_at, summary, message, customer, assignee, priority, source, timings)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                issues,
+            )
+        if attachments:
+            conn.executemany(
+                "INSERT INTO attachments (issue_key, filename, content_type, size, created_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                attachments,
+            )
+
+
+def _discard_queued() -> None:
+    while True:
+        try:
+            _queue.get_nowait()
+        except queue.Empty:
+            return
+        _queue.task_done()
+
+
+def _writer_loop() -> None:
+    global _disabled
+    try:
+        conn = _connect()
+    except (OSError, sqlite3.Error):
+        logger.exception("Issue ledger disabled: cannot open %s", LEDGER_DB_PATH)
+        _disabled = True
+        _discard_queued()
+        return
+    while True:
+        item = _queue.get()
+        if item is None:
+            _queue.task_done()
+            break
+        batch = [item]
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        stop = False
+        while len(batch) < BATCH_SIZE:
+            try:
+                nxt = _queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if nxt is None:
+                stop = True
+                break
+            batch.append(nxt)
+        try:
+            _write_batch(conn, batch)
+        except sqlite3.Error:
+            # Ledger is best-effort; never let a bad batch kill the writer
+            logger.exception("Issue ledger: dropped a batch of %d row(s)", len(batch))
+        for _ in range(len(batch) + stop):
+            _queue.task_done()
+        if stop:
+            break
+    conn.close()
+
+
+def _enqueue(kind: str, row: tuple) -> None:
+    global _writer
+    if not enabled():
+        return
+    if _writer is None or not _writer.is_alive():
+        with _writer_lock:
+            if _writer is None or not _writer.is_alive():
+                _writer = threading.Thread(target=_writer_loop, name="ledger-writer", daemon=True)
+                _writer.start()
+    try:
+        _queue.put_nowait((kind, row))
+    except queue.Full:
+        logger.warning("Issue ledger queue is full (%d rows); dropping %s row", MAX_QUEUED_ROWS, kind)
+
+
+def record_issue(
+    key: str,
+    url: str,
+    summary: str,
+    message: str,
+    *,
+    customer: str | None = None,
+    assignee: str | None = None,
+    priority: str | None = None,
+    source: str | None = None,
+    timings: dict | None = None,
+) -> None:
+    """Queue a created issue for the ledger. Returns immediately; the writer thread batches inserts."""
+    _enqueue(
+        "issue",
+        (
+            key, url, time.time(), summary, message, customer, assignee, priority, source,
+            json.dumps(timings) if timings else None,
+        ),
+    )
+
+
+def record_attachments(issue_key: str, files: list[tuple[str, bytes, str]]) -> None:
+    """Queue attachment metadata (filename, content type, size) for an issue."""
+    now = time.time()
+    for filename, content, content_type in files:
+        _enqueue("attachment", (issue_key, filename, content_type, len(content or b""), now))
+
+
+def flush(timeout: float = 5.0) -> None:
+    """Wait (up to timeout seconds) until all queued rows are written."""
+    deadline = time.monotonic() + timeout
+    while _queue.unfinished_tasks and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def close() -> None:
+    """Flush pending rows and stop the writer thread."""
+    global _writer
+    if _writer is not None and _writer.is_alive():
+        try:
+            _queue.put(None, timeout=5.0)
+        except queue.Full:
+            logger.warning("Issue ledger: writer did not drain the queue before shutdown")
+        _writer.join(timeout=5.0)
+    _writer = None
+
+
+def _fts_query(q: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must match (prefix match on each)."""
+    words = re.findall(r"\w+", q or "")
+    return " ".join(f'"{w}"*' for w in words[:16])
+
+
+def _with_attachments(conn: sqlite3.Connection, rows: list[sqlite3.Row]) -> list[dict]:
+    issues = []
+    for row in rows:
+        item = dict(row)
+        item["timings"] = json.loads(item["timings"]) if item["timings"] else None
+        item["attachments"] = []
+        issues.append(item)
+    if issues:
+        by_key = {item["key"]: item for item in issues}
+        placeholders = ",".join("?" * len(by_key))
+        for a in conn.execute(
+            f"SELECT issue_key, filename, content_type, size FROM attachments"
+            f" WHERE issue_key IN ({placeholders}) ORDER BY id",
+            list(by_key),
+        ):
+            by_key[a["issue_key"]]["attachments"].append(
+                {"filename": a["filename"], "content_type": a["content_type"], "size": a["size"]}
+            )
+    return issues
+
+
+def _page(issues: list[dict], limit: int) -> dict:
+    has_more = len(issues) > limit
+    issues = issues[:limit]
+    return {
+        "issues": issues,
+        "next_cursor": issues[-1]["id"] if has_more and issues else None,
+    }
+
+
+def recent(limit: int = 20, before: int | None = None) -> dict:
+    """Newest issues first. Keyset pagination: pass next_cursor back as before."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    conn = _reader()
+    if before is None:
+        rows = conn.execute(
+            f"SELECT {_ISSUE_COLUMNS} FROM issues ORDER BY id DESC LIMIT ?", (limit + 1,)
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            f"SELECT {_ISSUE_COLUMNS} FROM issues WHERE id < ? ORDER BY id DESC LIMIT ?",
+            (before, limit + 1),
+        ).fetchall()
+    return _page(_with_attachments(conn, rows), limit)
+
+
+def search(q: str, limit: int = 20, before: int | None = None) -> dict:
+    """Full-text search over summary, message and customer; newest first, keyset paginated."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    match = _fts_query(q)
+    if not match:
+        return {"issues": [], "next_cursor": None}
+    conn = _reader()
+    columns = ", ".join(f"i.{c.strip()}" for c in _ISSUE_COLUMNS.split(","))
+    sql = (
+        f"SELECT {columns} FROM issues_fts JOIN issues i ON i.id = issues_fts.rowid"
+        " WHERE issues_fts MATCH ?"
+    )
+    params: list = [match]
+    if before is not None:
+        sql += " AND issues_fts.rowid < ?"
+        params.append(before)
+    sql += " ORDER BY issues_fts.rowid DESC LIMIT ?"
+    params.append(limit + 1)
+    rows = conn.execute(sql, params).fetchall()
+    return _page(_with_attachments(conn, rows), limit)
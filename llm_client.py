@@ -1,14 +1,25 @@
 import re
 import httpx
 
-from config import GROQ_API_KEY, GROQ_MODEL
+from config import GROQ_API_KEY, GROQ_API_URL, GROQ_MODEL, SUMMARY_MODE
+from profiling import stage
 from prompts import FEEDBACK_TO_JIRA_PROMPT, SUMMARY_ONLY_PROMPT
+from summarizer import extractive_summary, prefers_local, record_route, remove_name
 
-GROQ_CHAT_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_CHAT_URL = GROQ_API_URL
 
 
-def generate_summary_only(feedback: str) -> str:
-    """Generate a short one-line summary from feedback. Use feedback as-is for description."""
+def _reply_text(data) -> str:
+    """Content of the first choice in a chat completion; "" for any unexpected response shape."""
+    choices = data.get("choices") if isinstance(data, dict) else None
+    first = choices[0] if isinstance(choices, list) and choices else None
+    message = first.get("message") if isinstance(first, dict) else None
+    content = message.get("content") if isinstance(message, dict) else None
+    return content if isinstance(content, str) else ""
+
+
+def _groq_summary(feedback: str) -> str | None:
+    """Ask Groq for a one-line summary. Returns None if the reply has no SUMMARY: line."""
     if not GROQ_API_KEY:
         raise ValueError("GROQ_API_KEY is not set. Get a free key at https://console.groq.com")
     prompt = f"{SUMMARY_ONLY_PROMPT}\n\nFEEDBACK:\n{feedback}"
@@ -18,7 +29,7 @@ def generate_summary_only(feedback: str) -> str:
         "max_tokens": 150,
         "temperature": 0.3,
     }
-    with httpx.Client(timeout=60.0) as client:
+    with stage("groq_http"), httpx.Client(timeout=60.0) as client:
         r = client.post(
             GROQ_CHAT_URL,
             json=payload,
@@ -28,12 +39,38 @@ def generate_summary_only(feedback: str) -> str:
             },
         )
         r.raise_for_status()
-    data = r.json()
-    text = (data.get("choices") or [{}])[0].get("message", {}).get("content", "") or ""
+    text = _reply_text(r.json())
     summary_match = re.search(r"SUMMARY:\s*(.+)", text, re.DOTALL | re.IGNORECASE)
     if summary_match:
         return " ".join(summary_match.group(1).strip().split())[:255] or "Bug"
-    return (feedback[:200].strip() or "Bug").split("\n")[0][:255]
+    return None
+
+
+def generate_summary_only(feedback: str) -> str:
+    """Generate a short one-line summary from feedback. Use feedback as-is for description."""
+    return _groq_summary(feedback) or extractive_summary(feedback)
+
+
+def summarize(feedback: str, customer: str | None = None) -> str:
+    """
+    Issue title for feedback, routed per SUMMARY_MODE:
+      - "local": extractive summarizer only (no network)
+      - "llm": Groq, falling back to the local summarizer if Groq is unset, fails or gives no SUMMARY line
+      - "auto" (default): local for short/structured messages, otherwise like "llm"
+    customer (e.g. a separate customer_name field) is kept out of the title on every route.
+    """
+    if SUMMARY_MODE == "local" or (SUMMARY_MODE != "llm" and prefers_local(feedback, customer)):
+        record_route("local")
+        return extractive_summary(feedback, customer)
+    try:
+        summary = _groq_summary(feedback)
+    except (ValueError, httpx.HTTPError):
+        summary = None
+    if summary is None:
+        record_route("fallback")
+        return extractive_summary(feedback, customer)
+    record_route("llm")
+    return " ".join(remove_name(summary, customer).split()).strip(" -:,") or "Bug"
 
 
 def generate_summary_and_description(feedback: str) -> tuple[str, str]:
@@ -57,8 +94,7 @@ def generate_summary_and_description(feedback: str) -> tuple[str, str]:
             },
         )
         r.raise_for_status()
-    data = r.json()
-    text = (data.get("choices") or [{}])[0].get("message", {}).get("content", "") or ""
+    text = _reply_text(r.json())
 
     summary = ""
     description = ""
@@ -0,0 +1,380 @@
+"""
+On-demand request profiling and slow-request capture.
+
+- A request carrying a valid signed X-Profile header, armed by the admin toggle
+  (profile_next) or picked by the sample rate, gets
+  statistical stack sampling for its lifetime: the event loop thread, plus each threadpool
+  thread while it runs the request's code (run_in_threadpool below, or any stage()).
+- Any traced request slower than slow_ms has its stage timings (and samples, if any)
+  saved to a bounded ring of JSON files in PROFILE_DIR.
+- When sampling, signing and slow capture are all off, the middleware is a pass-through.
+"""
+import contextvars
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+import anyio
+from starlette.concurrency import run_in_threadpool as _run_in_threadpool
+
+from config import (
+    PROFILE_DIR,
+    PROFILE_INTERVAL_MS,
+    PROFILE_RING_SIZE,
+    PROFILE_SAMPLE_RATE,
+    PROFILE_SECRET,
+    PROFILE_SLOW_MS,
+)
+
+PROFILE_HEADER = b"x-profile"
+# Signed header is "<unix_ts>.<hex hmac-sha256(PROFILE_SECRET, unix_ts)>", valid for this long
+SIGNATURE_MAX_AGE = 300
+
+_CAPTURE_ID = re.compile(r"^[0-9]{13}-[0-9a-f]{8}$")
+
+# Runtime settings; start from config, changed through the admin endpoint
+# (profile_next: force-profile the next N requests regardless of sample rate)
+settings = {"sample_rate": PROFILE_SAMPLE_RATE, "slow_ms": PROFILE_SLOW_MS, "profile_next": 0}
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar = contextvars.ContextVar("profile_trace", default=None)
+_ring_lock = threading.Lock()
+
+
+def sign(timestamp: int | None = None) -> str:
+    """Build a valid X-Profile header value (for scripts and admins holding PROFILE_SECRET)."""
+    ts = str(int(timestamp if timestamp is not None else time.time()))
+    digest = hmac.new(PROFILE_SECRET.encode(), ts.encode(), hashlib.sha256).hexdigest()
+    return f"{ts}.{digest}"
+
+
+def verify_signature(value: str) -> bool:
+    if not PROFILE_SECRET or not value or "." not in value:
+        return False
+    ts, _, digest = value.partition(".")
+    if not ts.isdigit() or abs(time.time() - int(ts)) > SIGNATURE_MAX_AGE:
+        return False
+    expected = hmac.new(PROFILE_SECRET.encode(), ts.encode(), hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, digest)
+
+
+def active() -> bool:
+    return (
+        bool(PROFILE_SECRET)
+        or settings["sample_rate"] > 0
+        or settings["slow_ms"] > 0
+        or settings["profile_next"] > 0
+    )
+
+
+class StackSampler:
+    """
+    Samples the Python stacks of the request's threads every interval seconds; counts collapsed
+    stacks rooted at "[event loop]" or "[threadpool]". thread_id (the event loop) is always
+    sampled; other threads only between attach() and detach().
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        # thread id -> number of open attach() calls
+        self._threads: Counter = Counter({thread_id: 1})
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def attach(self, thread_id: int) -> None:
+        with self._threads_lock:
+            self._threads[thread_id] += 1
+
+    def detach(self, thread_id: int) -> None:
+        with self._threads_lock:
+            self._threads[thread_id] -= 1
+            if self._threads[thread_id] <= 0:
+                del self._threads[thread_id]
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            with self._threads_lock:
+                thread_ids = list(self._threads)
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append("[event loop]" if thread_id == self.thread_id else "[threadpool]")
+                self.samples[";".join(reversed(stack))] += 1
+
+
+class RequestTrace:
+    """Stage timings (and optional stack samples) for one request."""
+
+    def __init__(self, method: str, path: str, sampled: bool):
+        self.method = method
+        self.path = path
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.stages: list[dict] = []
+        self.sampler: StackSampler | None = None
+
+    def offset_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+class _Stage:
+    __slots__ = ("trace", "name", "start", "thread_id")
+
+    def __init__(self, trace: RequestTrace, name: str):
+        self.trace = trace
+        self.name = name
+        self.thread_id = None
+
+    def __enter__(self):
+        self.start = self.trace.offset_ms()
+        if self.trace.sampler is not None:
+            # The stage may run in a threadpool thread (the contextvar follows run_in_threadpool)
+            self.thread_id = threading.get_ident()
+            self.trace.sampler.attach(self.thread_id)
+        return self
+
+    def __exit__(self, *exc):
+        end = self.trace.offset_ms()
+        if self.thread_id is not None:
+            self.trace.sampler.detach(self.thread_id)
+        self.trace.stages.append(
+            {"name": self.name, "start_ms": round(self.start, 3), "duration_ms": round(end - self.start, 3)}
+        )
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """Context manager timing a named stage of the current request; no-op when not traced."""
+    trace = _current.get()
+    if trace is None:
+        return _NULL_STAGE
+    return _Stage(trace, name)
+
+
+def _call_sampled(sampler: StackSampler, func, args, kwargs):
+    thread_id = threading.get_ident()
+    sampler.attach(thread_id)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        sampler.detach(thread_id)
+
+
+async def run_in_threadpool(func, *args, **kwargs):
+    """starlette's run_in_threadpool; when the current request is stack-sampled, so is the worker thread."""
+    trace = _current.get()
+    if trace is None or trace.sampler is None:
+        return await _run_in_threadpool(func, *args, **kwargs)
+    return await _run_in_threadpool(_call_sampled, trace.sampler, func, args, kwargs)
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: decides per request whether to trace/sample, and captures slow requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not active():
+            await self.app(scope, receive, send)
+            return
+
+        forced = False
+        if PROFILE_SECRET:
+            for name, value in scope.get("headers") or ():
+                if name == PROFILE_HEADER:
+                    forced = verify_signature(value.decode("latin-1"))
+                    break
+        if not forced and settings["profile_next"] > 0:
+            settings["profile_next"] -= 1
+            forced = True
+        sampled = forced or (settings["sample_rate"] > 0 and random.random() < settings["sample_rate"])
+        if not sampled and settings["slow_ms"] <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(scope.get("method", ""), scope.get("path", ""), sampled)
+        if sampled:
+            trace.sampler = StackSampler(threading.get_ident(), PROFILE_INTERVAL_MS / 1000)
+            trace.sampler.start()
+        status = {"code": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = _current.set(trace)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            duration_ms = trace.offset_ms()
+            if trace.sampler is not None:
+                trace.sampler.stop()
+            if forced or (settings["slow_ms"] > 0 and duration_ms >= settings["slow_ms"]):
+                try:
+                    await anyio.to_thread.run_sync(_save, trace, duration_ms, status["code"], forced)
+                except Exception:
+                    # Never let a failed capture replace the response (or the app's own exception)
+                    logger.exception("Could not save profile capture to %s", PROFILE_DIR)
+
+
+def _save(trace: RequestTrace, duration_ms: float, status_code: int, forced: bool) -> None:
+    capture_id = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+    capture = {
+        "id": capture_id,
+        "created_at": time.time(),
+        "method": trace.method,
+        "path": trace.path,
+        "status": status_code,
+        "duration_ms": round(duration_ms, 3),
+        "reason": "forced" if forced else "slow",
+        "interval_ms": PROFILE_INTERVAL_MS,
+        "stages": trace.stages,
+        "samples": dict(trace.sampler.samples) if trace.sampler else {},
+    }
+    directory = Path(PROFILE_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    with _ring_lock:
+        tmp = directory / f".{capture_id}.tmp"
+        tmp.write_text(json.dumps(capture), encoding="utf-8")
+        tmp.replace(directory / f"{capture_id}.json")
+        files = sorted(directory.glob("*.json"))
+        for old in files[: max(0, len(files) - PROFILE_RING_SIZE)]:
+            old.unlink(missing_ok=True)
+
+
+def list_captures() -> list[dict]:
+    """Saved captures, newest first (metadata only)."""
+    directory = Path(PROFILE_DIR)
+    if not directory.is_dir():
+        return []
+    captures = []
+    for path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        data["sample_count"] = sum(data.pop("samples", {}).values())
+        data["stage_count"] = len(data.pop("stages", []))
+        captures.append(data)
+    return captures
+
+
+def load_capture(capture_id: str) -> dict | None:
+    if not _CAPTURE_ID.match(capture_id or ""):
+        return None
+    path = Path(PROFILE_DIR) / f"{capture_id}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def to_collapsed(capture: dict) -> str:
+    """Brendan Gregg collapsed-stack format ("frame;frame;frame count" per line)."""
+    return "".join(f"{stack} {count}\n" for stack, count in capture.get("samples", {}).items())
+
+
+def to_speedscope(capture: dict) -> dict:
+    """speedscope.app file: sampled stacks (if any) plus stage timings as an evented profile."""
+    frames: list[dict] = []
+    index: dict[str, int] = {}
+
+    def frame_id(name: str) -> int:
+        if name not in index:
+            index[name] = len(frames)
+            frames.append({"name": name})
+        return index[name]
+
+    interval = capture.get("interval_ms") or PROFILE_INTERVAL_MS
+    profiles = []
+    # One sampled profile per thread kind ("[event loop]", "[threadpool]"); they overlap in time
+    by_thread: dict[str, dict] = {}
+    for stack, count in (capture.get("samples") or {}).items():
+        root = stack.split(";", 1)[0]
+        by_thread.setdefault(root if root.startswith("[") else "", {})[stack] = count
+    for root, samples in by_thread.items():
+        stacks = [[frame_id(f) for f in stack.split(";")] for stack in samples]
+        weights = [count * interval for count in samples.values()]
+        profiles.append({
+            "type": "sampled",
+            "name": f"{capture['method']} {capture['path']} (stack samples{' ' + root if root else ''})",
+            "unit": "milliseconds",
+            "startValue": 0,
+            "endValue": sum(weights),
+            "samples": stacks,
+            "weights": weights,
+        })
+    # Evented profile: the whole request as the root frame, stages nested inside. Always present,
+    # so a capture without samples or stages still opens in speedscope.
+    duration = capture["duration_ms"]
+    request_frame = frame_id(f"{capture['method']} {capture['path']}")
+    keyed = [((0, 1, -duration - 1), {"type": "O", "frame": request_frame, "at": 0})]
+    for s in capture.get("stages") or []:
+        fid = frame_id(f"stage: {s['name']}")
+        start = min(s["start_ms"], duration)
+        end = min(round(s["start_ms"] + s["duration_ms"], 3), duration)
+        # At equal timestamps: closes before opens, outer stages open first and close last
+        keyed.append(((start, 1, -(end - start)), {"type": "O", "frame": fid, "at": start}))
+        keyed.append(((end, 0, end - start), {"type": "C", "frame": fid, "at": end}))
+    keyed.append(((duration, 0, duration + 1), {"type": "C", "frame": request_frame, "at": duration}))
+    events = [event for _, event in sorted(keyed, key=lambda k: k[0])]
+    profiles.append({
+        "type": "evented",
+        "name": f"{capture['method']} {capture['path']} (stages)",
+        "unit": "milliseconds",
+        "startValue": 0,
+        "endValue": duration,
+        "events": events,
+    })
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": f"{capture['method']} {capture['path']} {capture['duration_ms']:.0f}ms",
+        "exporter": "jira-team-utility",
+        "activeProfileIndex": 0,
+        "shared": {"frames": frames},
+        "profiles": profiles,
+    }
@@ -0,0 +1,67 @@
+"""
+Start the app with a selectable serving profile (SERVE_PROFILE):
+
+  default     one uvicorn process (same as `uvicorn app:app`)
+  production  gunicorn master with preloaded app and N uvicorn workers (see gunicorn.conf.py)
+
+Both use uvloop/httptools when installed ("auto"), bind to $HOST:$PORT (default 0.0.0.0:8000)
+and shut down gracefully, letting in-flight requests (e.g. Jira creates) finish.
+"""
+import os
+import sys
+
+try:
+    from uvicorn_worker import UvicornWorker
+except ImportError:  # gunicorn/uvicorn-worker not installed (e.g. Windows): production profile unavailable
+    UvicornWorker = None
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# Blocking Jira/Groq calls share anyio's default threadpool of 40 threads per worker
+THREADPOOL_SIZE = 40
+# Connections/requests a worker accepts at once; more get 503 instead of queueing without bound.
+# Default: twice the threadpool, so a short queue can wait for a thread (0 = unlimited).
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", str(2 * THREADPOOL_SIZE)) or 0)
+# Seconds to let in-flight requests finish on shutdown
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30") or 30)
+
+
+if UvicornWorker is not None:
+
+    class ProductionWorker(UvicornWorker):
+        """Uvicorn worker for gunicorn with uvloop/httptools, bounded concurrency and graceful shutdown."""
+
+        CONFIG_KWARGS = {
+            **UvicornWorker.CONFIG_KWARGS,
+            "loop": "auto",
+            "http": "auto",
+            "limit_concurrency": LIMIT_CONCURRENCY or None,
+            "timeout_graceful_shutdown": GRACEFUL_TIMEOUT,
+        }
+
+
+def main() -> None:
+    profile = os.getenv("SERVE_PROFILE", "default").strip().lower()
+    if profile == "production":
+        if UvicornWorker is None:
+            sys.exit("SERVE_PROFILE=production needs gunicorn and uvicorn-worker (pip install -r requirements.txt)")
+        conf = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+        os.execvp("gunicorn", ["gunicorn", "-c", conf, "app:app"])
+    if profile != "default":
+        sys.exit(f"Unknown SERVE_PROFILE {profile!r}; use default or production")
+
+    import uvicorn
+
+    uvicorn.run(
+        "app:app",
+        host=HOST,
+        port=PORT,
+        loop="auto",
+        http="auto",
+        limit_concurrency=LIMIT_CONCURRENCY or None,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+    )
+
+
+if __name__ == "__main__":
+    main()
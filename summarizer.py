@@ -0,0 +1,189 @@
+"""Local extractive summarizer for Jira titles (no network, no LLM)."""
+import math
+import re
+import threading
+from collections import Counter
+
+from chat_utils import extract_customer_name
+
+MAX_TITLE_LENGTH = 100
+
+# Messages at or below this length (after cleanup) are titled locally in "auto" mode
+SHORT_MESSAGE_CHARS = 160
+
+_STOPWORDS = frozenset(
+    """a about above after again all also am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from further
+    had has have having he her here hers him his how i if in into is it its itself just let me
+    more most my no nor of off on once only or other our out over own please same she should so
+    some such than that the their them then there these they this those through to too under
+    until up very was we were what when where which while who whom why will with would you your
+    hi hello hey team guys folks thanks thank regards kindly pls plz fyi""".split()
+)
+
+# Words that usually mark the actual defect in a report
+_ERROR_TERMS = frozenset(
+    """error errors fail fails failed failing failure crash crashes crashed crashing broken bug
+    exception timeout timeouts timed unable cannot can't cant couldn't doesn't isn't won't not
+    wrong incorrect missing blank empty stuck hang hangs freeze freezes frozen slow lag lagging
+    delay delayed 400 401 403 404 500 502 503 504 invalid duplicate duplicated mismatch
+    unresponsive disappeared disappears""".split()
+)
+
+# Labels parsed elsewhere (customer/assignee/priority) never belong in a title. Only the label and its
+# value are dropped: a priority level, otherwise everything up to the next punctuation, so
+# "Priority: P1 checkout fails" keeps "checkout fails". "Label - value" only counts at line start.
+_META_NAMES = r"(?:customer(?:\s+name)?|assignee|assigned\s+to|assign\s+to|priority)"
+_PRIORITY_VALUE = r"(?:p[0-5]|highest|high|medium|low|lowest|critical|blocker|major|minor|trivial|urgent|normal)\b"
+_META_LABEL = re.compile(
+    rf"(?:^[ \t]*{_META_NAMES}\s*[:\-]|\b{_META_NAMES}\s*:)[ \t]*(?:{_PRIORITY_VALUE}|[^\n.,;#@]*)",
+    re.IGNORECASE | re.MULTILINE,
+)
+# Explicit title in a structured message: "Title: ...", "Summary: ...", "Issue: ..."
+_TITLE_LINE = re.compile(r"^\s*(title|summary|subject|issue)\s*[:\-]\s*(.+)$", re.IGNORECASE)
+# "Steps: ..." but not "https://..."
+_LABEL_PREFIX = re.compile(r"^\s*[A-Za-z][A-Za-z ]{0,30}\s*:(?!//)\s*")
+_BULLET_PREFIX = re.compile(r"^\s*(?:[-*•>]+\s*|\d+[.)]\s+)")
+_GREETING = re.compile(r"^\s*(hi|hello|hey|dear)\b[^,.!:\n]{0,40}[,.!:]\s*", re.IGNORECASE)
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])|\n+")
+_WORD = re.compile(r"[A-Za-z0-9][A-Za-z0-9'_]*")
+
+_stats_lock = threading.Lock()
+_stats: Counter = Counter()
+
+
+def record_route(route: str) -> None:
+    """Count one summary produced via route ("local", "llm" or "fallback")."""
+    with _stats_lock:
+        _stats[route] += 1
+
+
+def summary_stats() -> dict:
+    """Return how many titles were produced by each route since startup."""
+    with _stats_lock:
+        counts = dict(_stats)
+    total = sum(counts.values())
+    return {
+        "total": total,
+        "routes": counts,
+        "local_ratio": round((counts.get("local", 0) + counts.get("fallback", 0)) / total, 4) if total else 0.0,
+    }
+
+
+def remove_name(text: str, name: str | None) -> str:
+    """Remove every mention of name (and "name's") from text; "NA"/empty names are ignored."""
+    name = (name or "").strip()
+    if not text or not name or name.upper() == "NA":
+        return text or ""
+    return re.sub(rf"(?<!\w){re.escape(name)}(?:'s)?(?!\w)", "", text, flags=re.IGNORECASE)
+
+
+def strip_customer(text: str, customer: str | None = None) -> str:
+    """
+    Drop metadata labels with their values (the rest of the line is kept) and every mention of the customer name, both the one given
+    (e.g. a separate customer_name field) and one found in a "Customer:" label.
+    Mirrors the prompt rule "Do NOT include company or customer name".
+    """
+    if not text:
+        return ""
+    labelled = extract_customer_name(text)
+    text = _META_LABEL.sub("", text)
+    for name in {customer, labelled}:
+        text = remove_name(text, name)
+    return text
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences / non-empty lines."""
+    parts = (_BULLET_PREFIX.sub("", p).strip() for p in _SENTENCE_SPLIT.split(text or ""))
+    return [p for p in parts if _WORD.search(p)]
+
+
+def keywords(text: str, limit: int = 5) -> list[str]:
+    """
+    Most salient content words in text (stopwords and metadata labels removed): most frequent
+    first, then error terms, then alphabetical, so reordering the same words gives the same list.
+    """
+    words = [w.lower() for w in _WORD.findall(strip_customer(text or ""))]
+    counts = Counter(w for w in words if w not in _STOPWORDS and len(w) > 2)
+    ranked = sorted(counts, key=lambda w: (-counts[w], w not in _ERROR_TERMS, w))
+    return ranked[:limit]
+
+
+def _score_sentences(sentences: list[str]) -> list[float]:
+    """Score by keyword salience (document term frequency), error-term boost and position."""
+    tokenized = [[w.lower() for w in _WORD.findall(s)] for s in sentences]
+    freq = Counter(w for words in tokenized for w in words if w not in _STOPWORDS)
+    top = max(freq.values(), default=1)
+    scores = []
+    for index, words in enumerate(tokenized):
+        content = [w for w in words if w not in _STOPWORDS]
+        if not content:
+            scores.append(0.0)
+            continue
+        salience = sum(freq[w] / top for w in content) / math.sqrt(len(content))
+        errors = sum(1 for w in words if w in _ERROR_TERMS)
+        position = 1.0 / (1 + index)
+        # Very long sentences make poor titles even when salient
+        length_penalty = 0.5 if len(" ".join(words)) > 3 * MAX_TITLE_LENGTH else 1.0
+        scores.append((salience + 0.6 * min(errors, 3) + 0.8 * position) * length_penalty)
+    return scores
+
+
+def _to_title(sentence: str) -> str:
+    """Tidy a sentence into a single-line title of at most MAX_TITLE_LENGTH characters."""
+    text = _GREETING.sub("", sentence)
+    text = _LABEL_PREFIX.sub("", text) if len(text) > 40 else text
+    text = " ".join(text.split()).strip(" -:;,")
+    text = text.rstrip(".!")
+    if len(text) > MAX_TITLE_LENGTH:
+        cut = text[: MAX_TITLE_LENGTH + 1].rsplit(" ", 1)[0]
+        text = (cut if len(cut) >= MAX_TITLE_LENGTH // 2 else text[:MAX_TITLE_LENGTH]).rstrip(" ,;:-")
+    return text[:1].upper() + text[1:]
+
+
+def explicit_title(text: str) -> str | None:
+    """Return the value of a "Title:"/"Summary:"/"Issue:" line if the message has one."""
+    for line in (text or "").split("\n"):
+        m = _TITLE_LINE.match(line)
+        if m and _WORD.search(m.group(2)):
+            return m.group(2)
+    return None
+
+
+def extractive_summary(feedback: str, customer: str | None = None) -> str:
+    """Pick the best sentence from feedback and turn it into a Jira title (<= 100 chars) without the customer name."""
+    text = strip_customer(feedback or "", customer)
+    title = explicit_title(text)
+    if title:
+        return _to_title(title) or "Bug"
+    sentences = split_sentences(text)
+    if not sentences:
+        return "Bug"
+    scores = _score_sentences(sentences)
+    best = max(range(len(sentences)), key=lambda i: scores[i])
+    return _to_title(sentences[best]) or "Bug"
+
+
+def prefers_local(feedback: str, customer: str | None = None) -> bool:
+    """
+    Routing policy for "auto" mode: True when the LLM is unlikely to beat the local title.
+      - message carries an explicit Title/Summary/Issue line
+      - short message whose leading sentence already fits in a title
+      - highly structured message (mostly "Label: value" / bullet lines)
+    """
+    text = strip_customer(feedback or "", customer).strip()
+    if not text or not _WORD.search(text):
+        # Nothing left to title locally; let the LLM read the whole message
+        return False
+    if explicit_title(text):
+        return True
+    sentences = split_sentences(text)
+    if len(text) <= SHORT_MESSAGE_CHARS and sentences and len(sentences[0]) <= MAX_TITLE_LENGTH:
+        return True
+    lines = [line for line in text.split("\n") if line.strip()]
+    if len(lines) >= 3:
+        structured = sum(1 for line in lines if _LABEL_PREFIX.match(line) or _BULLET_PREFIX.match(line))
+        if structured / len(lines) >= 0.6:
+            return True
+    return False
@@ -0,0 +1,94 @@
+import asyncio
+
+from aggregator import BurstAggregator, group_key, jaccard, report_terms
+from summarizer import keywords
+
+SAFARI_1 = "Login fails on Safari after SSO. Customer: Acme"
+SAFARI_2 = "Safari login fails after SSO redirect. Customer: Acme"
+EXPORT = "CSV export is missing the salary column. Customer: Acme"
+
+
+def test_keywords_ignore_word_order_and_inline_labels():
+    assert keywords("Login fails on Safari after SSO", 2) == keywords("Safari SSO login fails", 2)
+    assert not {"customer", "acme"} & set(keywords(SAFARI_1))
+
+
+def test_reordered_paraphrases_share_a_group():
+    assert group_key("Acme", "customer+keywords") == group_key("acme ", "customer+keywords")
+    assert jaccard(report_terms(SAFARI_1), report_terms(SAFARI_2)) >= 0.5
+    assert jaccard(report_terms(SAFARI_1), report_terms(EXPORT)) < 0.5
+
+
+def test_aggregator_flushes_paraphrases_together():
+    flushed = []
+
+    async def flush(reports):
+        flushed.append([r["message"] for r in reports])
+        return [{"key": f"BUG-{len(flushed)}"} for _ in reports]
+
+    async def main():
+        aggregator = BurstAggregator(flush, window=0.05, max_group=10)
+        return await asyncio.gather(*(
+            aggregator.submit(group_key("Acme"), {"message": m}, report_terms(m))
+            for m in (SAFARI_1, EXPORT, SAFARI_2)
+        ))
+
+    results = asyncio.run(main())
+    assert sorted(flushed) == sorted([[SAFARI_1, SAFARI_2], [EXPORT]])
+    assert results[0] == results[2] != results[1]
+
+
+def _report(message, priority=None, assignee="Aeras Alvi"):
+    return {"message": message, "customer_name": "Acme", "assignee": assignee, "priority": priority, "files": []}
+
+
+def _stub_jira(monkeypatch, comment_error):
+    import app
+
+    created, comments = [], []
+
+    def create_issue(summary, message, **kwargs):
+        created.append((message, kwargs["ledger_priority"]))
+        return f"BUG-{len(created)}", f"https://jira/BUG-{len(created)}"
+
+    def add_comment(key, text):
+        comments.append(text)
+        raise comment_error
+
+    monkeypatch.setattr(app, "create_issue", create_issue)
+    monkeypatch.setattr(app, "add_comment", add_comment)
+    monkeypatch.setattr(app, "get_user_account_id_by_name", lambda project, name: "acc")
+    monkeypatch.setattr(app, "get_priority_id_by_name", lambda name: "1")
+    monkeypatch.setattr(app, "get_default_chat_component_id", lambda *a, **kw: "10")
+    monkeypatch.setattr(app, "summarize", lambda message, customer: message[:20])
+    monkeypatch.setattr(app, "burst_aggregator", object())
+    return app, created, comments
+
+
+def test_failed_comment_gives_related_reports_their_own_issues(monkeypatch):
+    import httpx
+
+    for error in (ValueError("Jira comment 400"), httpx.ConnectError("down")):
+        app, created, comments = _stub_jira(monkeypatch, error)
+        reports = [_report(SAFARI_1, "High"), _report(SAFARI_2, "Low", assignee="Bob")]
+        results = asyncio.run(app._create_chat_issue(reports))
+        assert "assignee: Bob, priority: Low" in comments[0]
+        assert [r["key"] for r in results] == ["BUG-1", "BUG-2"]
+        assert not results[0]["aggregated"] and not results[1]["aggregated"]
+        assert created[1] == (SAFARI_2, "Low")
+
+
+def test_flush_can_fail_single_reports():
+    async def flush(reports):
+        return [{"key": "BUG-1"}, ValueError("no component")]
+
+    async def main():
+        aggregator = BurstAggregator(flush, window=0.01, max_group=10)
+        return await asyncio.gather(
+            aggregator.submit("acme", {}, report_terms(SAFARI_1)),
+            aggregator.submit("acme", {}, report_terms(SAFARI_2)),
+            return_exceptions=True,
+        )
+
+    ok, failed = asyncio.run(main())
+    assert ok == {"key": "BUG-1"} and isinstance(failed, ValueError)
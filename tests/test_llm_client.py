@@ -0,0 +1,33 @@
+import httpx
+import pytest
+
+import llm_client
+
+MESSAGE = "Recruiters report that the interview scheduler shows times in UTC instead of IST, so candidates join late"
+
+
+@pytest.fixture
+def groq_reply(monkeypatch):
+    """Point llm_client at a fake Groq that answers every call with the given JSON body."""
+    def install(body):
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=body))
+        real_client = httpx.Client
+        monkeypatch.setattr(llm_client.httpx, "Client", lambda **kw: real_client(transport=transport, **kw))
+        monkeypatch.setattr(llm_client, "GROQ_API_KEY", "test")
+        monkeypatch.setattr(llm_client, "SUMMARY_MODE", "llm")
+    return install
+
+
+@pytest.mark.parametrize(
+    "body",
+    [[], {"choices": ["oops"]}, {"choices": [{"message": None}]}, {"choices": [{"message": {"content": "no label"}}]}],
+)
+def test_unexpected_groq_replies_fall_back_to_local_title(groq_reply, body):
+    groq_reply(body)
+    assert llm_client._groq_summary(MESSAGE) is None
+    assert llm_client.summarize(MESSAGE) == llm_client.extractive_summary(MESSAGE)
+
+
+def test_groq_summary_is_used(groq_reply):
+    groq_reply({"choices": [{"message": {"content": "SUMMARY: Scheduler shows UTC instead of IST"}}]})
+    assert llm_client.summarize(MESSAGE) == "Scheduler shows UTC instead of IST"
@@ -0,0 +1,46 @@
+import pytest
+
+from chat_utils import clean_message_for_jira
+from summarizer import extractive_summary, keywords, prefers_local, strip_customer
+
+
+@pytest.mark.parametrize(
+    "message, expected",
+    [
+        (
+            "#ZProdBug Priority: P1 checkout fails with 500 error on payment page",
+            "Checkout fails with 500 error on payment page",
+        ),
+        (
+            "#ZProdBug Customer: Acme. Checkout fails with 500 error on payment page",
+            "Checkout fails with 500 error on payment page",
+        ),
+        ("#ZProdBug Assignee: Bob. Resume parser crashes on PDF upload", "Resume parser crashes on PDF upload"),
+    ],
+)
+def test_labels_at_line_start_keep_the_report_text(message, expected):
+    assert extractive_summary(clean_message_for_jira(message)) == expected
+
+
+def test_label_lines_and_inline_labels_are_removed():
+    text = strip_customer("Customer - Acme\nPriority: High\nLogin fails after SSO. Assignee: Bob")
+    assert "Acme" not in text and "High" not in text and "Bob" not in text
+    assert "Login fails after SSO" in text
+    assert "customer" not in keywords("Login fails. Customer: Acme")
+
+
+def test_nothing_left_after_stripping_goes_to_the_llm():
+    assert not prefers_local("Customer: Acme\nPriority: High")
+
+
+def test_url_is_not_taken_for_a_label():
+    title = extractive_summary(
+        "Login page at https://app.example.com/login shows a blank screen for every recruiter since this morning"
+    )
+    assert title.startswith("Login page at https://app.example.com/login")
+
+
+def test_customer_name_ending_in_punctuation_is_removed():
+    title = extractive_summary("Acme Inc. reports login fails on Safari", "Acme Inc.")
+    assert "Acme" not in title
+    assert "login fails on Safari" in title